@@ -146,6 +146,16 @@ class DownloadFailedException(ApiException):
         return 'Downloading URL ({}) resulted in an error ({}: {})'.format(self.url, self.code, self.err)
 
 
+class UnsafeArchiveMemberException(ApiException):
+
+    def __init__(self, member):
+        self.member = member
+        super(UnsafeArchiveMemberException, self).__init__(self.__str__())
+
+    def __str__(self):
+        return 'Refusing to extract unsafe archive member: {}'.format(self.member)
+
+
 class PythonNotFoundException(ApiException):
 
     def __init__(self):
@@ -256,6 +266,17 @@ class MissingSetupPyArgumentException(ApiException):
         return "setup.py in repository '{}' doesnt contains an '{}' argument".format(self.repo, self.argument)
 
 
+class FailedReadingSetupPyException(ApiException):
+
+    def __init__(self, repo, reason):
+        self.repo = repo
+        self.reason = reason
+        super(FailedReadingSetupPyException, self).__init__(self.__str__())
+
+    def __str__(self):
+        return "Failed reading setup.py in repository '{}': {}".format(self.repo, self.reason)
+
+
 class FailedDetectingPackageMetadataException(ApiException):
 
     def __init__(self, argument, reason):
@@ -72,17 +72,17 @@ class Logger(object):
         for handler in self._logger.handlers:
             handler.setLevel(level)
 
-    def info(self, message, **kwargs):
-        self._log(logging.INFO, message, **kwargs)
+    def info(self, message, *args, **kwargs):
+        self._log(logging.INFO, message, *args, **kwargs)
 
-    def error(self, message, **kwargs):
-        self._log(logging.ERROR, message, **kwargs)
+    def error(self, message, *args, **kwargs):
+        self._log(logging.ERROR, message, *args, **kwargs)
 
-    def debug(self, message, **kwargs):
-        self._log(logging.DEBUG, message, **kwargs)
+    def debug(self, message, *args, **kwargs):
+        self._log(logging.DEBUG, message, *args, **kwargs)
 
-    def warn(self, message, **kwargs):
-        self._log(logging.WARN, message, **kwargs)
+    def warn(self, message, *args, **kwargs):
+        self._log(logging.WARN, message, *args, **kwargs)
 
     def isEnabledFor(self, level):
         return self._logger.isEnabledFor(level)
@@ -90,8 +90,18 @@ class Logger(object):
     # we disable this because for some reason it prevents
     # testfixtures from properly capturing logs for tests.
     # pylint: disable=logging-format-interpolation
-    def _log(self, level, message, **kwargs):
-        self._logger.log(level, '{}{}'.format(message, self.format_key_values(**kwargs)))
+    def _log(self, level, message, *args, **kwargs):
+
+        # formatting the key values is not free, and most of our log calls are debug
+        # messages that are filtered out anyway. bail out before doing any work.
+        if not self._logger.isEnabledFor(level):
+            return
+
+        # positional arguments are interpolated lazily, the same way the logging module does.
+        if args:
+            message = message % args
+
+        self._logger.log(level, '%s%s', message, self.format_key_values(**kwargs))
 
     @staticmethod
     def format_key_values(**kwargs):
@@ -99,7 +109,6 @@ class Logger(object):
         if not kwargs:
             return ''
 
-        kvs = []
-        for key, value in kwargs.items():
-            kvs.append('{}={}'.format(key, value))
-        return ' [{}]'.format(', '.join(kvs))
+        # this runs for every emitted log line, %-interpolation is cheaper than
+        # str.format and still works on python 2.
+        return ' [%s]' % ', '.join('%s=%s' % item for item in kwargs.items())
@@ -15,17 +15,86 @@
 #
 #############################################################################
 
-import copy
+import itertools
+import operator
+import re
 
-import semver
-from boltons.cacheutils import cachedproperty
-from jinja2 import Template
+import six
+from jinja2 import Environment
+
+try:
+    from functools import cached_property as cachedproperty
+except ImportError:
+    # python < 3.8
+    from boltons.cacheutils import cachedproperty
 
 from pyci.api import logger
 from pyci.api import exceptions
 from pyci.resources import get_text_resource
 
 
+# same pattern semver uses. we only ever need to validate a version and read
+# its numeric parts, which is cheaper to do directly than through semver.
+_semantic_version = re.compile(r"""
+    ^
+    (?P<major>0|[1-9][0-9]*)
+    \.
+    (?P<minor>0|[1-9][0-9]*)
+    \.
+    (?P<patch>0|[1-9][0-9]*)
+    (?:-(?:0|[1-9A-Za-z-][0-9A-Za-z-]*)(?:\.(?:0|[1-9A-Za-z-][0-9A-Za-z-]*))*)?
+    (?:\+[0-9A-Za-z-]+(?:\.[0-9A-Za-z-]+)*)?
+    $
+""", re.VERBOSE)
+
+_by_timestamp = operator.attrgetter('timestamp')
+
+
+def _format_version(major, minor, patch):
+    return '%d.%d.%d' % (major, minor, patch)
+
+
+# the rendered markdown is published as is, so the default whitespace handling is kept on purpose.
+_jinja_environment = Environment(autoescape=False)
+
+try:
+    # read the template source once at import time, so rendering never touches the disk.
+    _changelog_template_source = get_text_resource('changelog.jinja')
+except (IOError, OSError):  # pragma: no cover
+    # resources might not be accessible in some exotic installations,
+    # in which case we will try again on the first render.
+    _changelog_template_source = None
+
+_changelog_template = None
+
+_changelog_logger = None
+
+
+def _get_changelog_template():
+
+    # compiling the template costs a lot more than rendering it, and its source never
+    # changes during the lifetime of the process. do it once.
+    global _changelog_template  # pylint: disable=global-statement
+
+    if _changelog_template is None:
+        source = _changelog_template_source or get_text_resource('changelog.jinja')
+        _changelog_template = _jinja_environment.from_string(source)
+
+    return _changelog_template
+
+
+def _get_changelog_logger():
+
+    # all changelogs can share the same logger, no need to set one up per instance.
+    # it is created lazily since the log level is only determined once the cli parsed its options.
+    global _changelog_logger  # pylint: disable=global-statement
+
+    if _changelog_logger is None:
+        _changelog_logger = logger.Logger(__name__)
+
+    return _changelog_logger
+
+
 # pylint: disable=too-few-public-methods
 class Branch(object):
 
@@ -124,15 +193,14 @@ class Changelog(object):
         if not current_version:
             raise exceptions.InvalidArgumentsException('current_version cannot be empty')
 
-        try:
-            semver.parse(current_version)
-        except (TypeError, ValueError):
+        if not (isinstance(current_version, six.string_types) and
+                _semantic_version.match(current_version)):
             raise exceptions.InvalidArgumentsException('Version is not a legal semantic '
                                                        'version string')
 
         self._current_version = current_version
         self._sha = sha
-        self._logger = logger.Logger(__name__)
+        self._logger = _get_changelog_logger()
         self._log_ctx = {
             'sha': self.sha,
             'current_version': self._current_version
@@ -156,11 +224,7 @@ class Changelog(object):
                 their kind.
         """
 
-        the_lot = []
-        the_lot.extend(self.features)
-        the_lot.extend(self.bugs)
-        the_lot.extend(self.issues)
-        return self._sort(the_lot)
+        return self._sort(itertools.chain(self.features, self.bugs, self.issues))
 
     @property
     def empty(self):
@@ -188,23 +252,48 @@ class Changelog(object):
              str: The semantic version string
         """
 
-        result = self._current_version
-
         self._debug('Determining next version...')
 
-        for issue in self._sort(self.all_issues, reverse=False):
+        # bumping is order dependent (a minor bump resets the patches before it, a major bump
+        # resets both), so walk the issues in order, but only count the bumps. this way the
+        # version string is parsed and formatted once, instead of once per issue.
+        majors = minors = patches = 0
+
+        # issues without a version modifier never affect the version, leave them out before
+        # sorting. the rest are walked oldest first.
+        relevant = (issue for issue in itertools.chain(self.features, self.bugs, self.issues)
+                    if issue.version_modifier in ChangelogIssue.SEMANTIC_VERSION_LABELS)
+
+        for issue in self._sort(relevant, reverse=False):
 
             if issue.version_modifier == ChangelogIssue.PATCH:
-                result = semver.bump_patch(result)
+                patches += 1
 
             if issue.version_modifier == ChangelogIssue.MINOR:
-                result = semver.bump_minor(result)
+                minors += 1
+                patches = 0
 
             if issue.version_modifier == ChangelogIssue.MAJOR:
-                result = semver.bump_major(result)
+                majors += 1
+                minors = 0
+                patches = 0
+
+        self._debug('Counted version modifiers.', majors=majors, minors=minors, patches=patches)
 
-            self._debug('Applied issue on incremental result.', issue_title=issue.title,
-                        result=result, version_modifier=issue.version_modifier)
+        result = self._current_version
+
+        if majors or minors or patches:
+
+            current = _semantic_version.match(self._current_version)
+            major, minor, patch = (int(current.group(part)) for part in ('major', 'minor', 'patch'))
+
+            # like semver bumps, any bump drops the prerelease and build parts.
+            if majors:
+                result = _format_version(major + majors, minors, patches)
+            elif minors:
+                result = _format_version(major, minor + minors, patches)
+            else:
+                result = _format_version(major, minor, patch + patches)
 
         result = None if result == self._current_version else result
 
@@ -227,16 +316,9 @@ class Changelog(object):
                                                        '`pyci.api.changelog.ChangelogCommit` or '
                                                        '`pyci.api.changelog.ChangelogIssue`')
 
-        if isinstance(change, ChangelogIssue):
-            if change.kind_modifier == ChangelogIssue.FEATURE:
-                self.features.add(change)
-            if change.kind_modifier == ChangelogIssue.BUG:
-                self.bugs.add(change)
-            if change.kind_modifier == ChangelogIssue.ISSUE:
-                self.issues.add(change)
-
-        if isinstance(change, ChangelogCommit):
-            self.commits.add(change)
+        # each change knows which collection it belongs to.
+        # pylint: disable=protected-access
+        change._add_to(self)
 
     def render(self):
 
@@ -257,22 +339,26 @@ class Changelog(object):
         }
 
         self._debug('Rendering changelog markdown file')
-        markdown = Template(get_text_resource('changelog.jinja')).render(**kw)
+        markdown = _get_changelog_template().render(**kw)
         self._debug('Rendered markdown')
         return markdown
 
     @staticmethod
     def _sort(changes, reverse=True):
-        return sorted(changes, key=lambda change: change.timestamp, reverse=reverse)
+        return sorted(changes, key=_by_timestamp, reverse=reverse)
 
-    def _debug(self, message, **kwargs):
-        kwargs = copy.deepcopy(kwargs)
+    def _debug(self, message, *args, **kwargs):
+        # kwargs is a fresh dict built for this call, no need to copy it before merging.
         kwargs.update(self._log_ctx)
-        self._logger.debug(message, **kwargs)
+        self._logger.debug(message, *args, **kwargs)
 
 
 class _Change(object):
 
+    # changes are hashed and compared on every insertion to the changelog sets,
+    # slots keep those attribute lookups cheap and the instances small.
+    __slots__ = ('timestamp', 'title', 'url', '_hash')
+
     def __init__(self, title, url, timestamp):
 
         if not title:
@@ -287,12 +373,21 @@ class _Change(object):
         self.timestamp = timestamp
         self.title = title
         self.url = url
+        self._hash = hash(url)
 
     def __eq__(self, other):
-        return other.url == self.url
+        if not isinstance(other, _Change):
+            return NotImplemented
+        # comparing the cached hashes first spares most of the string comparisons.
+        return hash(other) == self._hash and other.url == self.url
+
+    def __ne__(self, other):
+        # python 2 does not derive this one from __eq__.
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
 
     def __hash__(self):
-        return hash(self.url)
+        return self._hash
 
 
 class ChangelogIssue(_Change):
@@ -316,12 +411,32 @@ class ChangelogIssue(_Change):
     SEMANTIC_VERSION_LABELS = [PATCH, MINOR, MAJOR]
     TYPE_LABELS = [FEATURE, BUG, ISSUE]
 
+    # which changelog collection holds each kind of issue.
+    _COLLECTIONS = {
+        FEATURE: 'features',
+        BUG: 'bugs',
+        ISSUE: 'issues'
+    }
+
+    __slots__ = ('kind_modifier', 'version_modifier', 'impl')
+
     def __init__(self, title, url, timestamp, kind=ISSUE, semantic=None, impl=None):
         super(ChangelogIssue, self).__init__(title, url, timestamp)
         self.kind_modifier = kind
         self.version_modifier = semantic
         self.impl = impl
 
+    def _add_to(self, changelog):
+
+        collection = self._COLLECTIONS.get(self.kind_modifier)
+
+        if collection is None:
+            raise exceptions.InvalidArgumentsException('Unknown issue kind: {}. Must be one of {}'
+                                                       .format(self.kind_modifier,
+                                                               self.TYPE_LABELS))
+
+        getattr(changelog, collection).add(self)
+
 
 class ChangelogCommit(_Change):
 
@@ -332,6 +447,11 @@ class ChangelogCommit(_Change):
         - impl (obj): The internal implementation of the issue.
     """
 
+    __slots__ = ('impl',)
+
     def __init__(self, title, url, timestamp, impl=None):
         super(ChangelogCommit, self).__init__(title, url, timestamp)
         self.impl = impl
+
+    def _add_to(self, changelog):
+        changelog.commits.add(self)
@@ -0,0 +1,299 @@
+#############################################################################
+# Copyright (c) 2018 Eli Polonsky. All rights reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+#   * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   * See the License for the specific language governing permissions and
+#   * limitations under the License.
+#
+#############################################################################
+
+import contextlib
+import os
+import tempfile
+
+try:
+    import fcntl
+    msvcrt = None
+except ImportError:
+    # windows
+    fcntl = None
+    import msvcrt  # pylint: disable=import-error
+
+from pyci.api import utils
+
+
+def _user_cache_home():
+    if utils.is_windows():
+        return os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    return os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+
+
+# everything pyci keeps between runs lives here. it is private to the user, since some of
+# it (virtualenvs) is executed later on.
+CACHE_DIR = os.path.join(_user_cache_home(), 'pyci')
+
+# virtualenvs are kept here between packaging runs.
+VIRTUALENVS_CACHE_DIR = os.path.join(CACHE_DIR, 'venvs')
+
+# how many cached virtualenvs are kept, the least recently used ones are removed first.
+VIRTUALENVS_CACHE_MAX_SIZE = 10
+
+# bundled resources (NSIS, the virtualenv distribution) are extracted here once, and reused.
+RESOURCES_CACHE_DIR = os.path.join(CACHE_DIR, 'resources')
+
+# pyinstaller work directories are kept here between packaging runs.
+PYINSTALLER_WORK_CACHE_DIR = os.path.join(CACHE_DIR, 'pyinstaller')
+
+# setting this environment variable (to anything) disables caching virtualenvs.
+NO_CACHE_ENV_VARIABLE = 'PYCI_NO_CACHE'
+
+# written to a cached virtualenv once it is fully created.
+# a directory without it is either being created right now, or its creation was interrupted.
+_READY_MARKER = '.pyci-ready'
+
+
+def enabled():
+
+    """
+    Whether or not virtualenvs should be cached.
+
+    Returns:
+        False if the PYCI_NO_CACHE environment variable is set, True otherwise.
+    """
+
+    return not os.environ.get(NO_CACHE_ENV_VARIABLE)
+
+
+def make_private_directory(path):
+
+    """
+    Create a directory (and its missing parents) only the current user has access to.
+
+    Args:
+        path (str): The directory path. Nothing happens if it already exists.
+    """
+
+    # unlike os.makedirs (on python >= 3.7), the mode applies to every directory created,
+    # not just the last one.
+    if os.path.isdir(path):
+        return
+
+    parent = os.path.dirname(path)
+    if parent != path:
+        make_private_directory(parent)
+
+    try:
+        os.mkdir(path, 0o700)
+    except OSError:
+        if not os.path.isdir(path):
+            raise
+
+
+@contextlib.contextmanager
+def lock(path, shared=False):
+
+    """
+    Lock a file, without waiting for it.
+
+    The lock belongs to the process, so the operating system releases it as soon as the process
+    exits, however it exits. A lock is never left behind by a killed process, no matter how long
+    it was held for. Windows has no shared locks, there a shared lock is an exclusive one.
+
+    Args:
+        path (str): Path to the lock file. It is created if needed, and never removed.
+        shared (:bool, optional): True to allow other shared locks at the same time.
+
+    Yields:
+        True if the lock was acquired, False if someone else is holding it.
+    """
+
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+
+    try:
+        locked = _try_lock(fd, shared)
+        try:
+            yield locked
+        finally:
+            if locked:
+                _unlock(fd)
+    finally:
+        os.close(fd)
+
+
+@contextlib.contextmanager
+def virtualenv(key, create):
+
+    """
+    Use the cached virtualenv of a key, creating it first if needed.
+
+    The virtualenv is not removed (e.g to make room for others) while it is being used.
+
+    Args:
+        key (str): Identifies the content of the virtualenv.
+        create (function): Creates the virtualenv in the path it is given.
+
+    Yields:
+        The path to the virtualenv, or None if it can't be used right now since someone else is
+        creating (or removing) it.
+    """
+
+    make_private_directory(VIRTUALENVS_CACHE_DIR)
+
+    path = os.path.join(VIRTUALENVS_CACHE_DIR, key)
+    lock_path = '{}.lock'.format(path)
+
+    if not _is_ready(path):
+
+        with lock(lock_path) as locked:
+
+            if not locked:
+                yield None
+                return
+
+            if not _is_ready(path):
+                _create(path, create)
+
+        _evict(VIRTUALENVS_CACHE_DIR, VIRTUALENVS_CACHE_MAX_SIZE)
+
+    with lock(lock_path, shared=True) as locked:
+
+        if not locked or not _is_ready(path):
+            yield None
+            return
+
+        # the marker's modification time is what eviction goes by.
+        os.utime(os.path.join(path, _READY_MARKER), None)
+
+        yield path
+
+
+@contextlib.contextmanager
+def pyinstaller_work_dir(key):
+
+    """
+    Use the pyinstaller work directory of a key.
+
+    Args:
+        key (str): Identifies what is being built in the work directory.
+
+    Yields:
+        The path to the work directory, or None if someone else is using it right now.
+    """
+
+    make_private_directory(PYINSTALLER_WORK_CACHE_DIR)
+
+    path = os.path.join(PYINSTALLER_WORK_CACHE_DIR, key)
+
+    with lock('{}.lock'.format(path)) as locked:
+        yield path if locked else None
+
+
+def resources(name, write):
+
+    """
+    Get the extracted resources of a name, extracting them first if needed.
+
+    Args:
+        name (str): Identifies the resources, and must change whenever they do.
+        write (function): Writes the resources to the directory it is given.
+
+    Returns:
+        The path to the directory containing the resources.
+    """
+
+    target = os.path.join(RESOURCES_CACHE_DIR, name)
+
+    if os.path.exists(target):
+        return target
+
+    make_private_directory(RESOURCES_CACHE_DIR)
+
+    # extract next to the target and rename it into place, renaming is atomic so
+    # concurrent packagers never see a partially extracted directory.
+    staging = tempfile.mkdtemp(dir=RESOURCES_CACHE_DIR)
+
+    try:
+        write(staging)
+        os.rename(staging, target)
+    except OSError:
+        # unless another packager got there first, its copy is just as good.
+        if not os.path.exists(target):
+            raise
+    finally:
+        if os.path.exists(staging):
+            utils.rmf(staging)
+
+    return target
+
+
+def _try_lock(fd, shared):
+    try:
+        if msvcrt:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        else:
+            fcntl.flock(fd, (fcntl.LOCK_SH if shared else fcntl.LOCK_EX) | fcntl.LOCK_NB)
+        return True
+    except (IOError, OSError):
+        return False
+
+
+def _unlock(fd):
+    if msvcrt:
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+def _is_ready(path):
+    return os.path.exists(os.path.join(path, _READY_MARKER))
+
+
+def _create(path, create):
+
+    # called with the exclusive lock held, so whatever is already there is left over from
+    # an interrupted creation that nobody is using.
+    if os.path.exists(path):
+        utils.rmf(path)
+
+    try:
+        create(path)
+    except BaseException:
+        if os.path.exists(path):
+            utils.rmf(path)
+        raise
+
+    with open(os.path.join(path, _READY_MARKER), 'w'):
+        pass
+
+
+def _evict(directory, max_size):
+
+    entries = []
+
+    for name in os.listdir(directory):
+        try:
+            last_used = os.path.getmtime(os.path.join(directory, name, _READY_MARKER))
+        except OSError:
+            # a lock file, or an entry that isn't ready.
+            continue
+        entries.append((last_used, name))
+
+    for _, name in sorted(entries, reverse=True)[max_size:]:
+
+        path = os.path.join(directory, name)
+
+        with lock('{}.lock'.format(path)) as locked:
+
+            # entries that are in use (or were just removed by someone else) are left alone.
+            if locked and _is_ready(path):
+                # without the marker, a partially removed entry is recreated on next use.
+                os.remove(os.path.join(path, _READY_MARKER))
+                utils.rmf(path)
@@ -15,28 +15,167 @@
 #
 #############################################################################
 
-import sys
+import ast
 import copy
+import sys
+import hashlib
+import json
 import logging
 import os
 import platform
+import re
 import shutil
 import tempfile
 import contextlib
+import multiprocessing
+from multiprocessing.pool import ThreadPool
+
+from boltons.cacheutils import LRU
+
+try:
+    from functools import cached_property as cachedproperty
+except ImportError:
+    # python < 3.8
+    from boltons.cacheutils import cachedproperty
 
-from boltons.cacheutils import cachedproperty
 from jinja2 import Template
 
 from pyci.api import logger, exceptions
 from pyci.api import utils
+from pyci.api.package import cache
 from pyci.api.runner import LocalCommandRunner
-from pyci.resources import get_text_resource
 from pyci.resources import get_binary_resource
+from pyci.resources import get_text_resource
+from pyci.resources import open_binary_resource
 
 
 DEFAULT_PY_INSTALLER_VERSION = '3.4'
 DEFAULT_WHEEL_VERSION = '0.33.4'
 
+VIRTUALENV_SUPPORT_WHEELS = [
+    'pip-19.1.1-py2.py3-none-any.whl',
+    'setuptools-41.0.1-py2.py3-none-any.whl'
+]
+
+# the bundled virtualenv (16.x) queries PyPI for newer seed packages unless told otherwise.
+# seeding only from the bundled wheels keeps virtualenv creation offline, and its result
+# fully determined by VIRTUALENV_SUPPORT_WHEELS.
+VIRTUALENV_OPTIONS = ['--no-wheel', '--no-download']
+
+# only virtualenvs whose requirements are all pinned to an exact version are cached, anything
+# else (unpinned, local paths, -r/-e options...) may install something different every time.
+_PINNED_REQUIREMENT = re.compile(r'^[A-Za-z0-9][A-Za-z0-9._-]*(\[[A-Za-z0-9._,\s-]*\])?'
+                                 r'\s*==\s*[A-Za-z0-9._+!-]+$')
+
+# the platform can't change while we are running.
+_PLATFORM_MACHINE = platform.machine()
+_PLATFORM_SYSTEM = platform.system()
+
+# statically parsed setup.py arguments, keyed by the file path, modification time and size.
+_setup_py_cache = LRU(max_size=32)
+
+# what ast raises for code it can't parse or evaluate. literal_eval fails with a TypeError on
+# e.g a set of lists, and deeply nested code exhausts the recursion limit (RecursionError is a
+# RuntimeError) or, on older pythons, the parser stack (MemoryError).
+_UNPARSABLE_ERRORS = (ValueError, TypeError, SyntaxError, RuntimeError, MemoryError)
+
+# executes a setup.py (argv[1]) with setuptools.setup replaced, and dumps the arguments it was
+# called with to a json file (argv[2]). runs in a separate interpreter, since replacing
+# setuptools.setup is global state, and since setup.py is arbitrary code. the arguments are
+# encoded the same way _parse_setup_py results are (see _json_default), the ones that can't be
+# (e.g cmdclass) are reported separately, and only fail the packager if it needs them.
+_SETUP_PY_INTROSPECTION_SCRIPT = '''
+import json
+import sys
+
+setup_py_path, output_path = sys.argv[1:3]
+sys.argv = [setup_py_path]
+
+try:
+    import setuptools
+except ImportError:
+    sys.exit('setuptools is not installed for {}'.format(sys.executable))
+
+kwargs = {}
+
+def _setup(*_, **setup_kwargs):
+    kwargs.update(setup_kwargs)
+
+setuptools.setup = _setup
+
+with open(setup_py_path, 'rb') as stream:
+    code = compile(stream.read(), setup_py_path, 'exec')
+
+exec(code, {'__name__': '__main__', '__file__': setup_py_path})
+
+def _default(value):
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=str)
+    raise TypeError('setup() argument value {!r} is not supported'.format(value))
+
+arguments = {}
+unsupported = {}
+
+for key, value in kwargs.items():
+    try:
+        arguments[key] = json.loads(json.dumps(value, default=_default))
+    except (TypeError, ValueError):
+        unsupported[key] = repr(value)
+
+with open(output_path, 'w') as stream:
+    json.dump({'arguments': arguments, 'unsupported': unsupported}, stream)
+'''
+
+_installer_template = None
+
+_virtualenv_dist_name = None
+
+
+def _json_default(value):
+
+    # json encodes tuples as lists, sets are encoded as (sorted) lists as well. anything else
+    # can't be represented faithfully, so it is rejected rather than turned into a string.
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=str)
+    raise TypeError('setup() argument value {!r} is not supported'.format(value))
+
+
+class _UnsupportedValue(object):
+
+    # a setup() argument value that executing setup.py can't pass back to us.
+
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+
+def _get_virtualenv_dist_name():
+
+    # the distribution is made of the bundled virtualenv.py and support wheels. the wheels are
+    # versioned, but virtualenv.py may change between pyci versions without changing its name.
+    global _virtualenv_dist_name  # pylint: disable=global-statement
+
+    if _virtualenv_dist_name is None:
+        key = hashlib.sha256(get_binary_resource('virtualenv.py'))
+        key.update(' '.join(VIRTUALENV_SUPPORT_WHEELS).encode('utf-8'))
+        _virtualenv_dist_name = 'virtualenv-dist-{}'.format(key.hexdigest()[:12])
+
+    return _virtualenv_dist_name
+
+
+def _get_installer_template():
+
+    # the template never changes, compile it once no matter how many installers we create.
+    # a concurrent first call might compile it twice, which is harmless.
+    global _installer_template  # pylint: disable=global-statement
+
+    if _installer_template is None:
+        _installer_template = Template(get_text_resource(os.path.join('windows_support',
+                                                                      'installer.nsi.jinja')))
+
+    return _installer_template
+
 
 class Packager(object):
 
@@ -50,6 +189,10 @@ class Packager(object):
     operate on it. If you specify a local path, it will operate directly on that path,
     in which case, the sha and repo arguments are irrelevant.
 
+    Virtualenvs of projects whose requirements are all pinned to an exact version are cached
+    (under ~/.cache/pyci) and reused between packaging runs. Set the PYCI_NO_CACHE environment
+    variable to disable this.
+
     Args:
 
         repo (:str, optional): The repository full name.
@@ -86,6 +229,7 @@ class Packager(object):
             utils.validate_directory_exists(path)
 
         self._repo_location = path if path else '{}@{}'.format(repo, sha)
+        self._local = bool(path)
         self._python = python
         self._target_dir = target_dir or os.getcwd()
         self._logger = logger.Logger(__name__)
@@ -100,7 +244,7 @@ class Packager(object):
         if path:
             repo_dir = path
         else:
-            self._debug('Downloading {}...'.format(self._repo_location))
+            self._debug('Downloading %s...', self._repo_location)
             repo_dir = utils.download_repo(repo, sha)
 
         return repo_dir
@@ -167,57 +311,54 @@ class Packager(object):
 
         """
 
-        temp_dir = tempfile.mkdtemp()
-        try:
-
-            base_name = base_name or self._name
-            entrypoint = entrypoint or self._entrypoint
+        base_name = base_name or self._name
+        entrypoint = entrypoint or self._entrypoint
 
-            destination = os.path.join(self._target_dir, '{0}-{1}-{2}'
-                                       .format(base_name, platform.machine(), platform.system()))
+        destination = os.path.join(self._target_dir, '{0}-{1}-{2}{3}'
+                                   .format(base_name, _PLATFORM_MACHINE, _PLATFORM_SYSTEM,
+                                           '.exe' if utils.is_windows() else ''))
 
-            if platform.system().lower() == 'windows':
-                destination = '{0}.exe'.format(destination)
+        try:
+            utils.validate_file_does_not_exist(path=destination)
+        except exceptions.FileExistException as e:
+            raise exceptions.BinaryExistsException(path=e.path)
 
-            try:
-                utils.validate_file_does_not_exist(path=destination)
-            except exceptions.FileExistException as e:
-                raise exceptions.BinaryExistsException(path=e.path)
+        script = os.path.join(self._repo_dir, entrypoint)
 
-            dist_dir = os.path.join(temp_dir, 'dist')
-            build_dir = os.path.join(temp_dir, 'build')
+        if not os.path.exists(script):
+            raise exceptions.EntrypointNotFoundException(repo=self._repo_location,
+                                                         entrypoint=entrypoint)
 
-            script = os.path.join(self._repo_dir, entrypoint)
+        temp_dir = tempfile.mkdtemp()
+        try:
 
-            if not os.path.exists(script):
-                raise exceptions.EntrypointNotFoundException(repo=self._repo_location,
-                                                             entrypoint=entrypoint)
+            dist_dir = os.path.join(temp_dir, 'dist')
 
-            with self._create_virtualenv(base_name) as virtualenv:
+            pyinstaller = 'pyinstaller=={}'.format(pyinstaller_version or
+                                                   DEFAULT_PY_INSTALLER_VERSION)
 
-                self._logger.debug('Installing pyinstaller...')
+            create_virtualenv = self._create_virtualenv(base_name,
+                                                        extra_requirements=[pyinstaller])
+            claim_work_dir = self._pyinstaller_work_dir(temp_dir, script, base_name, pyinstaller)
 
-                pip_path = utils.get_python_executable('pip', exec_home=virtualenv)
-                self._runner.run('{} pyinstaller=={}'
-                                 .format(self._pip_install(pip_path),
-                                         pyinstaller_version or DEFAULT_PY_INSTALLER_VERSION),
-                                 cwd=self._repo_dir)
+            with create_virtualenv as virtualenv, claim_work_dir as build_dir:
 
                 self._debug('Running pyinstaller...',
                             entrypoint=entrypoint,
                             destination=destination)
                 pyinstaller_path = utils.get_python_executable('pyinstaller', exec_home=virtualenv)
-                self._runner.run(
-                    '{} '
-                    '--onefile '
-                    '--distpath {} '
-                    '--workpath {} '
-                    '--specpath {} {}'
-                    .format(self._pyinstaller(pyinstaller_path),
-                            dist_dir,
-                            build_dir,
-                            temp_dir,
-                            script))
+                self._runner.run(self._pyinstaller(pyinstaller_path) + [
+                    '--onefile',
+                    '--distpath', dist_dir,
+                    '--workpath', build_dir,
+                    '--specpath', build_dir,
+                    script], execution_env={
+                        # pyinstaller's bincache is shared per user by default, concurrent
+                        # builds of different projects must not step on each other.
+                        'PYINSTALLER_CONFIG_DIR': os.path.join(build_dir, 'config'),
+                        # don't leave .pyc files behind in the repository.
+                        'PYTHONDONTWRITEBYTECODE': '1'
+                    })
 
                 self._debug('Finished running pyinstaller', entrypoint=entrypoint,
                             destination=destination)
@@ -226,7 +367,7 @@ class Packager(object):
 
             package_path = os.path.join(dist_dir, actual_name)
             self._debug('Copying package to destination...', src=package_path, dst=destination)
-            shutil.copy(package_path, destination)
+            utils.fast_copy(package_path, destination)
 
             self._debug('Packaged successfully.', package=destination)
             return os.path.abspath(destination)
@@ -254,35 +395,27 @@ class Packager(object):
 
         """
 
+        if not os.path.exists(self._setup_py_path):
+            raise exceptions.SetupPyNotFoundException(repo=self._repo_location)
+
         temp_dir = tempfile.mkdtemp()
         try:
 
             dist_dir = os.path.join(temp_dir, 'dist')
             bdist_dir = os.path.join(temp_dir, 'bdist')
 
-            if not os.path.exists(self._setup_py_path):
-                raise exceptions.SetupPyNotFoundException(repo=self._repo_location)
-
-            name = self._name
-
-            with self._create_virtualenv(name) as virtualenv:
-
-                self._logger.debug('Installing wheel...')
+            wheel = 'wheel=={}'.format(wheel_version or DEFAULT_WHEEL_VERSION)
 
-                pip_path = utils.get_python_executable('pip', exec_home=virtualenv)
-                self._runner.run('{} wheel=={}'
-                                 .format(self._pip_install(pip_path),
-                                         wheel_version or DEFAULT_WHEEL_VERSION),
-                                 cwd=self._repo_dir)
+            with self._create_virtualenv(self._name, extra_requirements=[wheel]) as virtualenv:
 
-                command = '{} {} bdist_wheel --bdist-dir {} --dist-dir {}'.format(
-                    utils.get_python_executable('python', exec_home=virtualenv),
-                    self._setup_py_path,
-                    bdist_dir,
-                    dist_dir)
+                command = [utils.get_python_executable('python', exec_home=virtualenv),
+                           self._setup_py_path,
+                           'bdist_wheel',
+                           '--bdist-dir', bdist_dir,
+                           '--dist-dir', dist_dir]
 
                 if universal:
-                    command = '{0} --universal'.format(command)
+                    command.append('--universal')
 
                 self._debug('Running bdist_wheel...', universal=universal)
 
@@ -299,7 +432,7 @@ class Packager(object):
             except exceptions.FileExistException as e:
                 raise exceptions.WheelExistsException(path=e.path)
 
-            shutil.copy(os.path.join(dist_dir, actual_name), destination)
+            utils.fast_copy(os.path.join(dist_dir, actual_name), destination)
             self._debug('Packaged successfully.', package=destination)
             return os.path.abspath(destination)
 
@@ -370,14 +503,14 @@ class Packager(object):
             raise exceptions.InvalidArgumentsException('Must pass binary_path')
 
         try:
-            self._debug('Validating binary exists: {}'.format(binary_path))
+            self._debug('Validating binary exists: %s', binary_path)
             utils.validate_file_exists(binary_path)
         except (exceptions.FileDoesntExistException, exceptions.FileIsADirectoryException):
             raise exceptions.BinaryDoesntExistException(binary_path)
 
         try:
             version = version or self._version
-            self._debug('Validating version string: {}'.format(version))
+            self._debug('Validating version string: %s', version)
             utils.validate_nsis_version(version)
         except exceptions.InvalidNSISVersionException as err:
             tb = sys.exc_info()[2]
@@ -392,7 +525,7 @@ class Packager(object):
         try:
             name = self._name
         except BaseException as e:
-            self._debug('Unable to extract default name from setup.py: {}. Using binary base name...'.format(str(e)))
+            self._debug('Unable to extract default name from setup.py: %s. Using binary base name...', e)
             name = installer_base_name
 
         installer_name = '{}-installer'.format(installer_base_name)
@@ -400,18 +533,18 @@ class Packager(object):
 
         destination = os.path.abspath(output or '{}.exe'.format(
             os.path.join(self._target_dir, installer_name)))
-        self._debug('Validating destination file does not exist: {}'.format(destination))
+        self._debug('Validating destination file does not exist: %s', destination)
         utils.validate_file_does_not_exist(destination)
 
         target_directory = os.path.abspath(os.path.join(destination, os.pardir))
 
-        self._debug('Validating target directory exists: {}'.format(target_directory))
+        self._debug('Validating target directory exists: %s', target_directory)
         utils.validate_directory_exists(target_directory)
 
         try:
             license_path = license_path or os.path.abspath(os.path.join(self._repo_dir,
                                                                         self._license))
-            self._debug('Validating license file exists: {}'.format(license_path))
+            self._debug('Validating license file exists: %s', license_path)
             utils.validate_file_exists(license_path)
         except (exceptions.FileDoesntExistException, exceptions.FileIsADirectoryException) as e:
             raise exceptions.LicenseNotFoundException(str(e))
@@ -440,49 +573,41 @@ class Packager(object):
 
             support = 'windows_support'
 
-            template = get_text_resource(os.path.join(support, 'installer.nsi.jinja'))
-            nsis_zip_resource = get_binary_resource(os.path.join(support, 'nsis-3.04.zip'))
-            path_header_resource = get_text_resource(os.path.join(support, 'path.nsh'))
-
             self._debug('Rendering nsi template...')
-            nsi = Template(template).render(**config)
+            nsi = _get_installer_template().render(**config)
             installer_path = os.path.join(temp_dir, 'installer.nsi')
             with open(installer_path, 'w') as f:
                 f.write(nsi)
-            self._debug('Finished rendering nsi template: {}'.format(installer_path))
+            self._debug('Finished rendering nsi template: %s', installer_path)
 
             self._debug('Writing path header file...')
             path_header_path = os.path.join(temp_dir, 'path.nsh')
-            with open(path_header_path, 'w') as header:
-                header.write(path_header_resource)
-            self._debug('Finished writing path header file: {}'.format(path_header_path))
-
-            self._debug('Extracting NSIS from resources...')
-
-            nsis_archive = os.path.join(temp_dir, 'nsis.zip')
-            with open(nsis_archive, 'wb') as _w:
-                _w.write(nsis_zip_resource)
-            utils.unzip(nsis_archive, target_dir=temp_dir)
-            self._debug('Finished extracting makensis.exe from resources: {}'.format(nsis_archive))
+            with open_binary_resource(os.path.join(support, 'path.nsh')) as resource, \
+                    open(path_header_path, 'wb') as header:
+                shutil.copyfileobj(resource, header)
+            self._debug('Finished writing path header file: %s', path_header_path)
 
-            makensis_path = os.path.join(temp_dir, 'nsis-3.04', 'makensis.exe')
-            command = '{} -DVERSION={} {}'.format(makensis_path, version, installer_path)
+            nsis_dir = self._extract_resources('nsis-3.04', self._write_nsis)
+            makensis_path = os.path.join(nsis_dir, 'nsis-3.04', 'makensis.exe')
+            command = [makensis_path, '-DVERSION={}'.format(version), installer_path]
 
             # The installer expects the binary to be located in the working directory
             # and be named {{ name }}.exe.
             # See installer.nsi.jinja#L85
             expected_binary_path = os.path.join(temp_dir, '{}.exe'.format(name))
-            self._debug('Copying binary to expected location: {}'.format(expected_binary_path))
-            shutil.copyfile(src=binary_path, dst=expected_binary_path)
+            self._debug('Copying binary to expected location: %s', expected_binary_path)
+            # a real copy, not a link. cleaning up temp_dir may change the permissions of
+            # the files in it, and this one is the user's.
+            shutil.copy(binary_path, expected_binary_path)
 
             self._debug('Creating installer...')
             self._runner.run(command, cwd=temp_dir)
 
             out_file = os.path.join(temp_dir, '{}.exe'.format(installer_name))
 
-            self._debug('Copying {} to target path...'.format(out_file))
-            shutil.copyfile(out_file, destination)
-            self._debug('Finished copying installer to target path: {}'.format(destination))
+            self._debug('Copying %s to target path...', out_file)
+            utils.fast_copy(out_file, destination)
+            self._debug('Finished copying installer to target path: %s', destination)
 
             self._debug('Packaged successfully.', package=destination)
 
@@ -491,6 +616,67 @@ class Packager(object):
         finally:
             utils.rmf(temp_dir)
 
+    def build_all(self, jobs):
+
+        """
+        Create several packages concurrently.
+
+        Packaging is mostly spent waiting on subprocesses (pip, pyinstaller, bdist_wheel), so
+        independent packages are created in parallel threads.
+
+        Args:
+
+            jobs (list): A list of dictionaries, each describing a single package to create.
+                The 'kind' key determines the package type ('binary', 'wheel' or 'nsis'), the rest
+                of the keys are passed as is to the corresponding method. Each kind may only
+                appear once, since packages of the same kind share build directories inside the
+                repository.
+
+        Returns:
+
+            list: The paths to the created packages, in the same order as the jobs.
+
+        Raises:
+
+            InvalidArgumentsException: A job of an unknown or duplicate kind was passed.
+
+        """
+
+        return self._build_concurrently([(self, job) for job in jobs],
+                                        max_workers=multiprocessing.cpu_count())
+
+    @staticmethod
+    def build_many(jobs, max_workers=None):
+
+        """
+        Create packages of several packagers concurrently.
+
+        This is the multi repository counterpart of 'build_all', useful when packaging many
+        repositories (or many revisions of the same one) at once.
+
+        Args:
+
+            jobs (list): A list of (packager, job) tuples. Each job is a dictionary in the format
+                accepted by 'build_all'. Each kind may only be requested once per repository
+                directory.
+
+            max_workers (:int, optional): How many packages to create at the same time.
+                Defaults to the number of CPUs.
+
+        Returns:
+
+            list: The paths to the created packages, in the same order as the jobs.
+
+        Raises:
+
+            InvalidArgumentsException: A job of an unknown kind, or a duplicate job for the same
+                repository directory, was passed.
+
+        """
+
+        return Packager._build_concurrently(jobs,
+                                            max_workers=max_workers or multiprocessing.cpu_count())
+
     @cachedproperty
     def _name(self):
         return self._setup_py_argument('name')
@@ -542,33 +728,104 @@ class Packager(object):
     @cachedproperty
     def _setup_py(self):
 
-        with open(self._setup_py_path) as f:
-            setup_py = f.read()
+        # packagers are often created over and over for the same repository (e.g one per
+        # package kind), no need to parse the same setup.py each time.
+        stat = os.stat(self._setup_py_path)
+        key = (os.path.abspath(self._setup_py_path), stat.st_mtime, stat.st_size)
 
-        kwargs = {}
+        kwargs = _setup_py_cache.get(key)
+
+        if kwargs is None:
+
+            # parsing the raw bytes lets python honor the file's own encoding declaration,
+            # instead of decoding it with whatever the locale encoding happens to be.
+            with open(self._setup_py_path, 'rb') as f:
+                setup_py = f.read()
+
+            kwargs = self._parse_setup_py(setup_py)
 
-        def _setup(*_, **__):
-            kwargs.update(__)
+            if kwargs is None:
+                # a setup.py that isn't all literals usually reads other files as well
+                # (e.g a version module), which the key above knows nothing about. so it is
+                # executed every time.
+                self._debug('setup.py arguments are not all literals, executing it instead...')
+                return self._exec_setup_py()
 
-        import setuptools
+            _setup_py_cache[key] = kwargs
 
-        setup_func = setuptools.setup
+        # the cached arguments are shared by every packager, none of them gets to modify them.
+        return copy.deepcopy(kwargs)
+
+    @staticmethod
+    def _parse_setup_py(setup_py):
+
+        # most setup.py files simply call setup with literal arguments. reading those statically
+        # spares importing setuptools and running arbitrary code. returns None whenever the
+        # arguments can't be fully determined this way.
 
         try:
+            tree = ast.parse(setup_py)
+        except _UNPARSABLE_ERRORS:
+            return None
 
-            with tempfile.NamedTemporaryFile() as errors:
+        calls = [node for node in ast.walk(tree) if isinstance(node, ast.Call) and
+                 (getattr(node.func, 'id', None) == 'setup' or
+                  getattr(node.func, 'attr', None) == 'setup')]
 
-                setuptools.setup = _setup
+        if len(calls) != 1:
+            return None
 
-                obj = compile(setup_py, errors.name, mode='exec')
+        call = calls[0]
+
+        if call.args or getattr(call, 'starargs', None) or getattr(call, 'kwargs', None):
+            return None
+
+        kwargs = {}
 
-                # pylint: disable=eval-used
-                eval(obj)
+        for keyword in call.keywords:
 
-                return kwargs
+            if keyword.arg is None:
+                # **kwargs (python 3)
+                return None
 
+            try:
+                kwargs[keyword.arg] = ast.literal_eval(keyword.value)
+            except _UNPARSABLE_ERRORS:
+                return None
+
+        # the same representation executing setup.py yields, e.g tuples become lists.
+        try:
+            return json.loads(json.dumps(kwargs, default=_json_default))
+        except (TypeError, ValueError):
+            return None
+
+    def _exec_setup_py(self):
+
+        fd, output = tempfile.mkstemp()
+        os.close(fd)
+
+        try:
+            response = self._runner.run([self._interpreter,
+                                         '-c', _SETUP_PY_INTROSPECTION_SCRIPT,
+                                         self._setup_py_path,
+                                         output],
+                                        exit_on_failure=False,
+                                        cwd=self._repo_dir)
+
+            if response.return_code != 0:
+                raise exceptions.FailedReadingSetupPyException(
+                    repo=self._repo_location,
+                    reason=response.std_err or response.std_out)
+
+            with open(output) as stream:
+                result = json.load(stream)
+
+            kwargs = result['arguments']
+            for key, value in result['unsupported'].items():
+                kwargs[key] = _UnsupportedValue(value)
+            return kwargs
         finally:
-            setuptools.setup = setup_func
+            os.remove(output)
 
     @cachedproperty
     def _interpreter(self):
@@ -585,75 +842,136 @@ class Packager(object):
         if not interpreter:
             raise exceptions.PythonNotFoundException()
 
-        self._debug('Python interpreter: {}'.format(interpreter))
+        self._debug('Python interpreter: %s', interpreter)
 
         return interpreter
 
-    # pylint: disable=too-many-branches
-    @contextlib.contextmanager
-    def _create_virtualenv(self, name):
+    def _virtualenv_cache_key(self, extra_requirements):
 
-        temp_dir = tempfile.mkdtemp()
+        # returns None if the virtualenv shouldn't be cached at all.
+        if not cache.enabled() or self._pinned_requirements is None:
+            return None
 
-        virtualenv_path = os.path.join(temp_dir, name)
+        # everything that affects the content of the virtualenv we create.
+        key = hashlib.sha256()
+        for part in list(extra_requirements) + self._pinned_requirements + [
+                self._interpreter, self._interpreter_version,
+                ' '.join(VIRTUALENV_OPTIONS), _get_virtualenv_dist_name()]:
+            key.update(part.encode('utf-8'))
+            key.update(b'\0')
 
-        self._debug('Creating virtualenv {}'.format(virtualenv_path))
+        return key.hexdigest()
 
-        def _create_virtualenv_dist():
+    @cachedproperty
+    def _pinned_requirements(self):
 
-            dist_directory = os.path.join(temp_dir, 'virtualenv-dist')
-            support_directory = os.path.join(dist_directory, 'virtualenv_support')
+        # the project requirements, sorted, or None if any of them isn't pinned to an exact
+        # version. the virtualenv of a project like that can't be reused, since what gets
+        # installed in it depends on more than the requirements themselves.
+        requirements_file = os.path.join(self._repo_dir, 'requirements.txt')
+        requirements = []
 
-            os.makedirs(dist_directory)
-            os.makedirs(support_directory)
+        if os.path.exists(requirements_file):
+            with open(requirements_file) as stream:
+                requirements = stream.read().splitlines()
+        elif os.path.exists(self._setup_py_path):
+            requirements = self._setup_py_value('install_requires') or []
+            if not isinstance(requirements, list):
+                requirements = str(requirements).splitlines()
 
-            _virtualenv_py = os.path.join(dist_directory, 'virtualenv.py')
+        pinned = []
 
-            def _write_support_wheel(_wheel):
+        for requirement in requirements:
 
-                with open(os.path.join(support_directory, _wheel), 'wb') as _w:
-                    _w.write(get_binary_resource(os.path.join('virtualenv_support', _wheel)))
+            requirement = re.sub(r'(^|\s)#.*$', '', requirement).strip()
 
-            with open(_virtualenv_py, 'w') as venv_py:
-                venv_py.write(get_text_resource('virtualenv.py'))
+            if not requirement:
+                continue
 
-            _write_support_wheel('pip-19.1.1-py2.py3-none-any.whl')
-            _write_support_wheel('setuptools-41.0.1-py2.py3-none-any.whl')
+            if not _PINNED_REQUIREMENT.match(requirement):
+                self._debug('Requirement %s is not pinned, not caching the virtualenv',
+                            requirement)
+                return None
 
-            return _virtualenv_py
+            pinned.append(requirement)
 
-        virtualenv_py = _create_virtualenv_dist()
+        return sorted(pinned)
 
-        create_virtualenv_command = '{} {} --no-wheel {}'.format(self._interpreter,
-                                                                 virtualenv_py,
-                                                                 virtualenv_path)
+    @cachedproperty
+    def _interpreter_version(self):
 
-        requirements_file = os.path.join(self._repo_dir, 'requirements.txt')
+        # the same path may point to a different python over time (e.g after an upgrade).
+        return self._runner.run([self._interpreter, '-c', 'import sys; print(sys.version)'],
+                                cwd=self._repo_dir).std_out.strip()
 
-        self._runner.run(create_virtualenv_command, cwd=self._repo_dir)
+    @contextlib.contextmanager
+    def _create_virtualenv(self, name, extra_requirements=()):
 
-        pip_path = utils.get_python_executable('pip', exec_home=virtualenv_path)
+        key = self._virtualenv_cache_key(extra_requirements)
 
-        install_command = None
+        if key is None:
+            with self._create_temporary_virtualenv(name, extra_requirements) as virtualenv_path:
+                yield virtualenv_path
+            return
 
-        if os.path.exists(requirements_file):
+        def _populate(virtualenv_path):
+            self._populate_virtualenv(virtualenv_path, name, extra_requirements)
 
-            self._debug('Using requirements file: {}'.format(requirements_file))
-            install_command = '{} -r {}'.format(self._pip_install(pip_path), requirements_file)
+        with cache.virtualenv(key, _populate) as cached_virtualenv:
 
-        elif os.path.exists(self._setup_py_path):
+            if cached_virtualenv is None:
+                # someone else is creating this virtualenv right now, don't wait on it - just
+                # use a throwaway one.
+                self._debug('Cached virtualenv %s is not ready, creating a temporary one...', key)
+                with self._create_temporary_virtualenv(name,
+                                                       extra_requirements) as virtualenv_path:
+                    yield virtualenv_path
+                return
+
+            self._debug('Using cached virtualenv %s', cached_virtualenv)
+            yield cached_virtualenv
+
+    @contextlib.contextmanager
+    def _pyinstaller_work_dir(self, temp_dir, script, base_name, pyinstaller):
 
-            self._debug('Using install_requires from setup.py: {}'.format(self._setup_py_path))
-            requires = self._setup_py.get('install_requires')
-            install_command = '{} {}'.format(self._pip_install(pip_path), ' '.join(requires))
+        temporary = os.path.join(temp_dir, 'build')
 
-        if install_command:
-            self._debug('Installing {} requirements...'.format(name))
-            self._runner.run(install_command, cwd=self._repo_dir)
+        # pyinstaller doesn't notice changes in the installed dependencies, a work directory
+        # is only reused along with the exact same (cached) virtualenv.
+        virtualenv_key = self._virtualenv_cache_key([pyinstaller])
 
-        self._debug('Successfully created virtualenv {}'.format(virtualenv_path))
+        if not self._local or virtualenv_key is None:
+            # downloaded repositories are never packaged twice from the same location.
+            yield temporary
+            return
+
+        # pyinstaller only re-analyzes what changed if its work directory (and spec file)
+        # survives between runs, so it is kept per project, entrypoint and virtualenv.
+        key = hashlib.sha256()
+        for part in [os.path.abspath(script), base_name, virtualenv_key]:
+            key.update(part.encode('utf-8'))
+            key.update(b'\0')
+
+        with cache.pyinstaller_work_dir(key.hexdigest()) as work_dir:
+
+            if work_dir is None:
+                # the same project is being packaged concurrently, don't share the work
+                # directory.
+                self._debug('Work directory %s is in use, using a temporary one...',
+                            key.hexdigest())
+                yield temporary
+                return
+
+            yield work_dir
+
+    @contextlib.contextmanager
+    def _create_temporary_virtualenv(self, name, extra_requirements):
+
+        temp_dir = tempfile.mkdtemp()
 
         try:
+            virtualenv_path = os.path.join(temp_dir, name)
+            self._populate_virtualenv(virtualenv_path, name, extra_requirements)
             yield virtualenv_path
         finally:
             try:
@@ -664,19 +982,146 @@ class Packager(object):
                     # (pip install) On windows, this causes a [Error 5] Access is denied error.
                     # Eventually I will have to fix this - until then, sorry windows users...
                     self._debug("Failed cleaning up temporary directory after creating virtualenv "
-                                "{}: {} - You might have some leftovers because of this..."
-                                .format(temp_dir, str(e)))
+                                "%s: %s - You might have some leftovers because of this...",
+                                temp_dir, e)
                 else:
                     raise
 
+    def _extract_resources(self, name, write):
+
+        # extracting the bundled resources costs more than it seems (NSIS alone is a few
+        # thousand files), and they never change for a given pyci version. do it once per machine.
+        directory = cache.resources(name, write)
+        self._debug('Using extracted resources %s', directory)
+        return directory
+
+    @staticmethod
+    def _write_nsis(directory):
+
+        # no need to write the archive to disk just to read it back.
+        with open_binary_resource(os.path.join('windows_support', 'nsis-3.04.zip')) as archive:
+            utils.unzip(archive, target_dir=directory)
+
+    @staticmethod
+    def _write_virtualenv_dist(directory):
+
+        support_directory = os.path.join(directory, 'virtualenv_support')
+        os.makedirs(support_directory)
+
+        with open(os.path.join(directory, 'virtualenv.py'), 'w') as venv_py:
+            venv_py.write(get_text_resource('virtualenv.py'))
+
+        for support_wheel in VIRTUALENV_SUPPORT_WHEELS:
+            with open_binary_resource(os.path.join('virtualenv_support', support_wheel)) as _r, \
+                    open(os.path.join(support_directory, support_wheel), 'wb') as _w:
+                shutil.copyfileobj(_r, _w)
+
+    def _populate_virtualenv(self, virtualenv_path, name, extra_requirements=()):
+
+        self._debug('Creating virtualenv %s', virtualenv_path)
+
+        dist_directory = self._extract_resources(_get_virtualenv_dist_name(),
+                                                 self._write_virtualenv_dist)
+
+        create_virtualenv_command = [self._interpreter,
+                                     os.path.join(dist_directory, 'virtualenv.py')]
+        create_virtualenv_command.extend(VIRTUALENV_OPTIONS)
+        create_virtualenv_command.append(virtualenv_path)
+
+        self._runner.run(create_virtualenv_command, cwd=self._repo_dir)
+
+        requirements_file = os.path.join(self._repo_dir, 'requirements.txt')
+
+        # the packaging tools (pyinstaller, wheel) are installed along with the project
+        # requirements, a single pip run is considerably faster than two.
+        requirements = list(extra_requirements)
+
+        if os.path.exists(requirements_file):
+
+            self._debug('Using requirements file: %s', requirements_file)
+            requirements.extend(['-r', requirements_file])
+
+        elif os.path.exists(self._setup_py_path):
+
+            self._debug('Using install_requires from setup.py: %s', self._setup_py_path)
+            requirements.extend(self._setup_py_value('install_requires') or [])
+
+        if requirements:
+            self._debug('Installing %s requirements...', name)
+            pip_path = utils.get_python_executable('pip', exec_home=virtualenv_path)
+            self._runner.run(self._pip_install(pip_path) + requirements, cwd=self._repo_dir)
+
+        self._debug('Successfully created virtualenv %s', virtualenv_path)
+
+    @staticmethod
+    def _validate_kind(kind):
+        if kind not in ['binary', 'wheel', 'nsis']:
+            raise exceptions.InvalidArgumentsException('Unknown package kind: {}'.format(kind))
+
+    def _prepare_build(self):
+        if os.path.exists(self._setup_py_path):
+            # read setup.py once here, instead of racing on it (and possibly executing it
+            # more than once) from the worker threads.
+            _ = self._setup_py
+
+    def _build(self, job):
+        kwargs = dict(job)
+        kind = kwargs.pop('kind')
+        self._debug('Creating %s package...', kind)
+        return getattr(self, kind)(**kwargs)
+
+    @staticmethod
+    def _build_concurrently(jobs, max_workers):
+
+        # pylint: disable=protected-access
+        keys = [(os.path.abspath(packager._repo_dir), job.get('kind')) for packager, job in jobs]
+
+        for _, kind in keys:
+            Packager._validate_kind(kind)
+
+        if len(set(keys)) != len(keys):
+            # packages of the same kind share build directories inside the repository.
+            raise exceptions.InvalidArgumentsException('Each package kind may only be '
+                                                       'requested once per repository: {}'
+                                                       .format(keys))
+
+        if not jobs:
+            return []
+
+        for packager in set(packager for packager, _ in jobs):
+            packager._prepare_build()
+
+        # pyci errors derive from BaseException, which the pool workers don't catch. a worker
+        # raising one just dies, and map never returns. so the errors are caught here instead,
+        # and re-raised in the calling thread once all jobs are done.
+        def _build(packager_job):
+            packager, job = packager_job
+            try:
+                return packager._build(job), None
+            except BaseException:  # pylint: disable=broad-except
+                return None, sys.exc_info()
+
+        pool = ThreadPool(processes=min(len(jobs), max_workers))
+        try:
+            results = pool.map(_build, jobs)
+        finally:
+            pool.close()
+            pool.join()
+
+        for _, error in results:
+            if error is not None:
+                utils.raise_with_traceback(error[1], error[2])
+
+        return [result for result, _ in results]
+
     def _setup_py_argument(self, argument):
 
         if not os.path.exists(self._setup_py_path):
             err = exceptions.SetupPyNotFoundException(repo=self._repo_location)
 
         else:
-            self._debug('Reading {} from setup.py...'.format(argument))
-            value = self._setup_py.get(argument)
+            self._debug('Reading %s from setup.py...', argument)
+            value = self._setup_py_value(argument)
             if value is None:
                 err = exceptions.MissingSetupPyArgumentException(repo=self._repo_location,
                                                                  argument=argument)
@@ -685,21 +1130,33 @@ class Packager(object):
 
         raise exceptions.FailedDetectingPackageMetadataException(argument=argument, reason=err)
 
-    def _debug(self, message, **kwargs):
-        kwargs = copy.deepcopy(kwargs)
+    def _setup_py_value(self, argument):
+
+        value = self._setup_py.get(argument)
+
+        if isinstance(value, _UnsupportedValue):
+            raise exceptions.FailedReadingSetupPyException(
+                repo=self._repo_location,
+                reason="unsupported value for argument '{}': {}".format(argument, value.value))
+
+        return value
+
+    def _debug(self, message, *args, **kwargs):
         kwargs.update(self._log_ctx)
-        self._logger.debug(message, **kwargs)
+        self._logger.debug(message, *args, **kwargs)
 
     def _pip_install(self, pip_path):
 
-        command = '{} install'.format(pip_path)
+        # wheels install much faster than building source distributions, and there is no reason
+        # to hit the index just to check whether pip itself is outdated.
+        command = [pip_path, 'install', '--prefer-binary', '--disable-pip-version-check']
         if self._logger.isEnabledFor(logging.DEBUG):
-            command = '{} -v'.format(command)
+            command.append('-v')
         return command
 
     def _pyinstaller(self, pyinstaller_path):
 
-        command = pyinstaller_path
+        command = [pyinstaller_path]
         if self._logger.isEnabledFor(logging.DEBUG):
-            command = '{} --log-level DEBUG'.format(command)
+            command.extend(['--log-level', 'DEBUG'])
         return command
@@ -15,7 +15,6 @@
 #
 #############################################################################
 
-import copy
 import os
 import tempfile
 
@@ -142,6 +141,5 @@ class PyPI(object):
             utils.rmf(temp_dir)
 
     def _debug(self, message, **kwargs):
-        kwargs = copy.deepcopy(kwargs)
         kwargs.update(self._log_ctx)
         self._logger.debug(message, **kwargs)
@@ -86,7 +86,7 @@ class LocalCommandRunner(object):
         try:
             command_env = os.environ.copy()
             command_env.update(execution_env or {})
-            self._debug('Creating subprocess: {}'.format(popen_args))
+            self._debug('Creating subprocess: %s', popen_args)
             p = subprocess.Popen(args=popen_args,
                                  stdout=opipe,
                                  stderr=epipe,
@@ -94,7 +94,7 @@ class LocalCommandRunner(object):
                                  env=command_env,
                                  universal_newlines=True)
 
-            self._debug('Process {} started: {}. Waiting for it to finish...'.format(popen_args, p.pid))
+            self._debug('Process %s started: %s. Waiting for it to finish...', popen_args, p.pid)
             p.wait()
 
             self._debug('Finished running command.', command=command, exit_code=p.returncode, cwd=cwd)
@@ -132,8 +132,8 @@ class LocalCommandRunner(object):
             std_err=err,
             return_code=p.returncode)
 
-    def _debug(self, message, **kwargs):
-        self._logger.debug(message, **kwargs)
+    def _debug(self, message, *args, **kwargs):
+        self._logger.debug(message, *args, **kwargs)
 
 
 def shlex_split(command):
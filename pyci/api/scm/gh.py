@@ -15,17 +15,21 @@
 #
 #############################################################################
 
-import copy
 import os
 import tempfile
 
 import semver
-from boltons.cacheutils import cachedproperty
 from github import Github
 from github import InputGitTreeElement
 from github.GithubException import GithubException
 from github.GithubException import UnknownObjectException
 
+try:
+    from functools import cached_property as cachedproperty
+except ImportError:
+    # python < 3.8
+    from boltons.cacheutils import cachedproperty
+
 from pyci.api import exceptions
 from pyci.api import logger
 from pyci.api import utils
@@ -674,13 +678,12 @@ class GitHubRepository(object):
 
             # This might be a draft release, in which case we need to list and filter
             # since 'get' doesn't fetch draft releases. (but list does for some reason)
-            releases = [r for r in self.repo.get_releases() if r.title == title]
+            # the listing is paginated, stop at the first match instead of fetching every page.
+            release = next((r for r in self.repo.get_releases() if r.title == title), None)
 
-            if not releases:
+            if release is None:
                 raise exceptions.ReleaseNotFoundException(release=title)
 
-            release = releases[0]
-
             draft = True
 
         try:
@@ -770,10 +773,9 @@ class GitHubRepository(object):
                 raise exceptions.UpdateNotFastForwardException(ref=ref.ref, sha=sha)
             raise  # pragma: no cover
 
-    def _debug(self, message, **kwargs):
-        kwargs = copy.deepcopy(kwargs)
+    def _debug(self, message, *args, **kwargs):
         kwargs.update(self._log_ctx)
-        self._logger.debug(message, **kwargs)
+        self._logger.debug(message, *args, **kwargs)
 
 
 class _GitHubCommit(object):
@@ -781,6 +783,7 @@ class _GitHubCommit(object):
     def __init__(self, repo, sha):
         self._repo = repo
         self._sha = sha
+        self._issues_labels = {}
         self._runner = LocalCommandRunner()
         self._logger = logger.Logger(__name__)
         self._log_ctx = {
@@ -812,8 +815,7 @@ class _GitHubCommit(object):
         labels = set()
 
         for issue in self.issues:
-            issues_labels = set([label.name for label in issue.impl.get_labels()])
-            labels.update(issues_labels)
+            labels.update(self._fetch_issue_labels(issue.impl))
 
         self._debug('Fetched labels.', labels=','.join([label for label in labels]))
 
@@ -942,7 +944,12 @@ class _GitHubCommit(object):
 
             pre_commit(commit)
 
-            issues = self._repo.detect_issues(message=commit.commit.message)
+            if commit.sha == self.commit.sha:
+                # the issues of this very commit might have already been
+                # detected during validation, no need to go over the links again.
+                issues = self.issues
+            else:
+                issues = self._repo.detect_issues(message=commit.commit.message)
 
             if not issues:
                 self._debug('Found commit.', sha=commit.sha, commit_message=commit.commit.message)
@@ -970,9 +977,7 @@ class _GitHubCommit(object):
     def _add_issue_to_changelog(self, issue, changelog):
 
         issue = issue.impl
-        self._debug('Fetching labels...', issue=issue.number)
-        labels = [label.name for label in list(issue.get_labels())]
-        self._debug('Fetched labels.', issue=issue.number, labels=','.join(labels))
+        labels = self._fetch_issue_labels(issue)
 
         semantic = None
 
@@ -1004,6 +1009,18 @@ class _GitHubCommit(object):
         self._debug('Adding change to changelog.', change=change.url)
         changelog.add(change)
 
+    def _fetch_issue_labels(self, issue):
+
+        # labels are needed both for validating the commit and for generating its changelog,
+        # make sure we only ask github for them once.
+        if issue.number not in self._issues_labels:
+            self._debug('Fetching labels...', issue=issue.number)
+            labels = [label.name for label in issue.get_labels()]
+            self._debug('Fetched labels.', issue=issue.number, labels=','.join(labels))
+            self._issues_labels[issue.number] = labels
+
+        return self._issues_labels[issue.number]
+
     def _fetch_commits(self, base):
 
         all_commits = self._repo.repo.get_commits(sha=self.commit.sha)
@@ -1042,10 +1059,9 @@ class _GitHubCommit(object):
         tag = self._repo.repo.get_git_ref(ref='tags/{0}'.format(tag_name))
         return self._repo.repo.get_commit(sha=tag.object.sha)
 
-    def _debug(self, message, **kwargs):
-        kwargs = copy.deepcopy(kwargs)
+    def _debug(self, message, *args, **kwargs):
         kwargs.update(self._log_ctx)
-        self._logger.debug(message, **kwargs)
+        self._logger.debug(message, *args, **kwargs)
 
 
 def _empty_hook(*_, **__):
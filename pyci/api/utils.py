@@ -21,6 +21,7 @@ import re
 import shutil
 import stat
 import sys
+import tarfile
 import tempfile
 import uuid
 import zipfile
@@ -33,6 +34,21 @@ import requests
 from pyci.api import exceptions
 
 
+# the platform can't change while we are running, no need to ask for it on every check.
+_IS_WINDOWS = platform.system().lower() == 'windows'
+
+# on pythons that support extraction filters, have tarfile enforce its own safety
+# checks on top of ours.
+_TAR_EXTRACT_OPTIONS = {'filter': 'data'} if hasattr(tarfile, 'data_filter') else {}
+
+# extract_links runs for every commit in a changelog, compile the patterns once.
+_link = re.compile(r'#(\d+)')
+
+_setup_py_version_argument = re.compile('.*(version=.*),?')
+
+_setup_py_version_value = re.compile('version=["\'](.*)["\']')
+
+
 def extract_links(commit_message):
 
     """
@@ -54,7 +70,7 @@ def extract_links(commit_message):
 
     """
 
-    p = re.findall(r'#(\d+)', commit_message)
+    p = _link.findall(commit_message)
 
     return [int(l) for l in p]
 
@@ -93,6 +109,33 @@ def rmf(directory):
     shutil.rmtree(directory, onerror=remove_read_only)
 
 
+def fast_copy(src, dst):
+
+    """
+    Copy a file, preferring a hard link over an actual copy of the bytes.
+
+    When both paths reside on the same file system, the destination is simply linked to the
+    source, which costs a single metadata operation regardless of the file size. Otherwise,
+    the file content and permission bits are copied.
+
+    Args:
+        src (str): Path to the source file.
+        dst (str): Path to the destination file. Must not exist.
+    """
+
+    link = getattr(os, 'link', None)
+
+    if link is not None:
+        try:
+            link(src, dst)
+            return
+        except OSError:
+            # different file systems, or a file system that does not support hard links.
+            pass
+
+    shutil.copy(src, dst)
+
+
 def validate_file_exists(path):
 
     """
@@ -150,7 +193,7 @@ def unzip(archive, target_dir=None):
     Unzips a zip archive.
 
     Args:
-        archive (str): Path to the zip archive.
+        archive (:str:file): Path to the zip archive, or a file-like object holding it.
         target_dir (:`str`, optional): A directory to unzip the archive to. Defaults to a
             temporary directory.
 
@@ -207,8 +250,7 @@ def generate_setup_py(setup_py, version):
         str: The modified contents of the setup.py file with the new version number.
     """
 
-    p = re.compile('.*(version=.*),?')
-    match = p.search(setup_py)
+    match = _setup_py_version_argument.search(setup_py)
     if match:
         return setup_py.replace(match.group(1), "version='{0}',".format(version))
     raise exceptions.FailedGeneratingSetupPyException(setup_py=setup_py, version=version)
@@ -270,7 +312,7 @@ def is_windows():
          True if windows, False otherwise.
     """
 
-    return platform.system().lower() == 'windows'
+    return _IS_WINDOWS
 
 
 def download_repo(repo_name, sha):
@@ -289,7 +331,7 @@ def download_repo(repo_name, sha):
 
     repo_base_name = '/'.join(repo_name.split('/')[1:])
 
-    url = 'https://github.com/{}/archive/{}.zip'.format(repo_name, sha)
+    url = 'https://github.com/{}/archive/{}.tar.gz'.format(repo_name, sha)
 
     headers = {}
 
@@ -298,14 +340,68 @@ def download_repo(repo_name, sha):
         headers = {
             'Authorization': 'token {}'.format(token)
         }
-    archive = download(url, headers=headers)
-    repo_dir = unzip(archive=archive)
 
-    repo_dir = os.path.join(repo_dir, '{}-{}'.format(repo_base_name, sha))
+    # the archive is extracted straight off the socket, without a read timeout a stalled
+    # connection would hang the extraction forever. (connect, read) in seconds.
+    with requests.get(url, stream=True, headers=headers, timeout=(10, 60)) as r:
+
+        if r.status_code != 200:
+            raise exceptions.DownloadFailedException(url=url, code=r.status_code, err=r.reason)
+
+        target_dir = tempfile.mkdtemp()
+
+        try:
+            # unlike a zip archive, which can only be read once it is entirely on disk,
+            # a tarball can be extracted while it is being downloaded.
+            r.raw.decode_content = True
+            with tarfile.open(fileobj=r.raw, mode='r|gz') as tar:
+                for member in tar:
+                    _validate_archive_member(member, target_dir)
+                    tar.extract(member, target_dir, **_TAR_EXTRACT_OPTIONS)
+        except BaseException:
+            rmf(target_dir)
+            raise
+
+    repo_dir = os.path.join(target_dir, '{}-{}'.format(repo_base_name, sha))
 
     return repo_dir
 
 
+def _validate_archive_member(member, target_dir):
+
+    # the archive comes from the network, make sure none of its members
+    # ends up (or points to) outside of the target directory.
+    target_dir = os.path.realpath(target_dir)
+
+    def _is_inside(path):
+        path = os.path.realpath(path)
+        return path == target_dir or path.startswith(os.path.join(target_dir, ''))
+
+    path = os.path.join(target_dir, member.name)
+
+    if os.path.isabs(member.name):
+        raise exceptions.UnsafeArchiveMemberException(member=member.name)
+
+    if not _is_inside(path):
+        # '..' traversal
+        raise exceptions.UnsafeArchiveMemberException(member=member.name)
+
+    if member.issym() or member.islnk():
+
+        if os.path.isabs(member.linkname):
+            raise exceptions.UnsafeArchiveMemberException(member=member.name)
+
+        # symbolic links are relative to the member, hard links to the archive root.
+        link_base = os.path.dirname(path) if member.issym() else target_dir
+
+        if not _is_inside(os.path.join(link_base, member.linkname)):
+            raise exceptions.UnsafeArchiveMemberException(member=member.name)
+
+    elif not (member.isfile() or member.isdir()):
+        # devices, fifos and the like
+        raise exceptions.UnsafeArchiveMemberException(member=member.name)
+
+
 def is_python_3():
 
     """
@@ -358,16 +454,12 @@ def extract_version_from_setup_py(setup_py_content):
          The version defined in setup.py
     """
 
-    regex = 'version=["\'](.*)["\']'
-
-    name = re.compile(regex)
-
-    match = name.search(setup_py_content)
+    match = _setup_py_version_value.search(setup_py_content)
 
     if match:
         return match.group(1)
 
-    raise exceptions.RegexMatchFailureException(regex=regex)
+    raise exceptions.RegexMatchFailureException(regex=_setup_py_version_value.pattern)
 
 
 def which(program):
@@ -15,6 +15,8 @@
 #
 #############################################################################
 
+import io
+import os
 import pkgutil
 
 
@@ -44,3 +46,25 @@ def get_binary_resource(path):
     """
 
     return pkgutil.get_data(__name__, path)
+
+
+def open_binary_resource(path):
+
+    """
+    Open a resource binary file for reading.
+
+    Unlike get_binary_resource, this does not load the entire resource to memory when the package
+    resides on the file system, which is the case unless we are frozen or zipped.
+
+    Args:
+        path (str): The path of the resource relative to this package.
+    Returns:
+        file: A binary file-like object, to be closed by the caller.
+    """
+
+    resource_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), path)
+
+    if os.path.isfile(resource_path):
+        return open(resource_path, 'rb')
+
+    return io.BytesIO(get_binary_resource(path))
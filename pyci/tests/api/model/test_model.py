@@ -252,6 +252,19 @@ class TestChangelog(object):
 
         assert expected_number_of_features == len(changelog.features)
 
+    @staticmethod
+    def test_add_issue_unknown_kind():
+
+        changelog = model.Changelog(sha='sha', current_version='0.0.1')
+
+        issue = model.ChangelogIssue(title='issue',
+                                     url='url',
+                                     timestamp=100,
+                                     kind='unknown')
+
+        with pytest.raises(exceptions.InvalidArgumentsException):
+            changelog.add(issue)
+
     @staticmethod
     def test_add_identical_bugs():
 
@@ -344,6 +357,36 @@ class TestChangelog(object):
 
         assert expected_version == changelog.next_version
 
+    @staticmethod
+    def test_next_version_bumps_reset_by_later_bumps():
+
+        changelog = model.Changelog(sha='sha', current_version='1.2.3')
+
+        changelog.add(model.ChangelogIssue(title='early patch issue',
+                                           url='url1',
+                                           timestamp=10,
+                                           semantic=model.ChangelogIssue.PATCH))
+        changelog.add(model.ChangelogIssue(title='minor issue',
+                                           url='url2',
+                                           timestamp=20,
+                                           semantic=model.ChangelogIssue.MINOR))
+        changelog.add(model.ChangelogIssue(title='another minor issue',
+                                           url='url3',
+                                           timestamp=30,
+                                           semantic=model.ChangelogIssue.MINOR))
+        changelog.add(model.ChangelogIssue(title='late patch issue',
+                                           url='url4',
+                                           timestamp=40,
+                                           semantic=model.ChangelogIssue.PATCH))
+        changelog.add(model.ChangelogIssue(title='another late patch issue',
+                                           url='url5',
+                                           timestamp=50,
+                                           semantic=model.ChangelogIssue.PATCH))
+
+        expected_version = '1.4.2'
+
+        assert expected_version == changelog.next_version
+
     @staticmethod
     def test_next_version_none(request):
 
@@ -0,0 +1,255 @@
+#############################################################################
+# Copyright (c) 2018 Eli Polonsky. All rights reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+#   * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   * See the License for the specific language governing permissions and
+#   * limitations under the License.
+#
+#############################################################################
+
+import os
+import stat
+import subprocess
+import sys
+import time
+
+import pytest
+
+import pyci
+from pyci.api.package import cache
+
+
+def _marker(key):
+    return os.path.join(cache.VIRTUALENVS_CACHE_DIR, key, '.pyci-ready')
+
+
+def test_lock(temp_dir):
+
+    path = os.path.join(temp_dir, 'lock')
+
+    with cache.lock(path) as locked:
+
+        assert locked
+
+        with cache.lock(path) as concurrent:
+            assert not concurrent
+
+    with cache.lock(path) as again:
+        assert again
+
+
+@pytest.mark.linux
+def test_lock_shared(temp_dir):
+
+    path = os.path.join(temp_dir, 'lock')
+
+    with cache.lock(path, shared=True) as first, cache.lock(path, shared=True) as second:
+
+        assert first and second
+
+        with cache.lock(path) as exclusive:
+            assert not exclusive
+
+
+def test_lock_released_when_process_is_killed(temp_dir):
+
+    path = os.path.join(temp_dir, 'lock')
+
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.path.dirname(os.path.dirname(os.path.abspath(pyci.__file__)))
+
+    process = subprocess.Popen([sys.executable, '-c', '''
+import sys
+import time
+
+from pyci.api.package import cache
+
+with cache.lock(sys.argv[1]):
+    print('locked')
+    sys.stdout.flush()
+    time.sleep(60)
+''', path], stdout=subprocess.PIPE, env=env)
+
+    try:
+        assert process.stdout.readline().strip() == b'locked'
+
+        with cache.lock(path) as locked:
+            assert not locked
+    finally:
+        process.kill()
+        process.wait()
+        process.stdout.close()
+
+    with cache.lock(path) as locked:
+        assert locked
+
+
+@pytest.mark.linux
+def test_make_private_directory(temp_dir):
+
+    directory = os.path.join(temp_dir, 'parent', 'child')
+
+    cache.make_private_directory(directory)
+
+    for path in [directory, os.path.dirname(directory)]:
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o700
+
+
+def test_virtualenv_created_once(mocker):
+
+    create = mocker.Mock(side_effect=os.makedirs)
+
+    with cache.virtualenv('key', create) as first:
+        pass
+
+    with cache.virtualenv('key', create) as second:
+        pass
+
+    assert first == second == os.path.join(cache.VIRTUALENVS_CACHE_DIR, 'key')
+    assert create.call_count == 1
+
+
+def test_virtualenv_being_created(mocker):
+
+    create = mocker.Mock(side_effect=os.makedirs)
+
+    cache.make_private_directory(cache.VIRTUALENVS_CACHE_DIR)
+
+    with cache.lock(os.path.join(cache.VIRTUALENVS_CACHE_DIR, 'key.lock')):
+        with cache.virtualenv('key', create) as virtualenv:
+            assert virtualenv is None
+
+    assert create.call_count == 0
+
+
+def test_virtualenv_interrupted(mocker):
+
+    create = mocker.Mock(side_effect=os.makedirs)
+
+    # left over by a creation that was killed midway.
+    leftover = os.path.join(cache.VIRTUALENVS_CACHE_DIR, 'key', 'leftover')
+    os.makedirs(leftover)
+
+    with cache.virtualenv('key', create) as virtualenv:
+        assert virtualenv == os.path.dirname(leftover)
+
+    assert create.call_count == 1
+    assert not os.path.exists(leftover)
+
+
+def test_virtualenv_failed(mocker):
+
+    def _create(path):
+        os.makedirs(path)
+        raise RuntimeError('failed')
+
+    with pytest.raises(RuntimeError):
+        with cache.virtualenv('key', _create):
+            pass
+
+    assert not os.path.exists(os.path.join(cache.VIRTUALENVS_CACHE_DIR, 'key'))
+
+    create = mocker.Mock(side_effect=os.makedirs)
+
+    with cache.virtualenv('key', create):
+        pass
+
+    assert create.call_count == 1
+
+
+def test_virtualenv_evicts_least_recently_used(mocker):
+
+    mocker.patch('pyci.api.package.cache.VIRTUALENVS_CACHE_MAX_SIZE', 2)
+
+    for key in ['old', 'recent']:
+        with cache.virtualenv(key, os.makedirs):
+            pass
+
+    long_ago = time.time() - 60
+    os.utime(_marker('old'), (long_ago, long_ago))
+
+    with cache.virtualenv('new', os.makedirs):
+        pass
+
+    assert not os.path.exists(os.path.join(cache.VIRTUALENVS_CACHE_DIR, 'old'))
+    assert os.path.exists(_marker('recent'))
+    assert os.path.exists(_marker('new'))
+
+
+def test_virtualenv_in_use_not_evicted(mocker):
+
+    mocker.patch('pyci.api.package.cache.VIRTUALENVS_CACHE_MAX_SIZE', 1)
+
+    with cache.virtualenv('used', os.makedirs) as used:
+
+        long_ago = time.time() - 60
+        os.utime(_marker('used'), (long_ago, long_ago))
+
+        with cache.virtualenv('new', os.makedirs):
+            pass
+
+        assert os.path.exists(_marker('used'))
+
+    assert used == os.path.join(cache.VIRTUALENVS_CACHE_DIR, 'used')
+
+
+def test_pyinstaller_work_dir():
+
+    with cache.pyinstaller_work_dir('key') as first:
+
+        assert first == os.path.join(cache.PYINSTALLER_WORK_CACHE_DIR, 'key')
+
+        # concurrent builds don't share it.
+        with cache.pyinstaller_work_dir('key') as concurrent:
+            assert concurrent is None
+
+        with cache.pyinstaller_work_dir('other') as other:
+            assert other == os.path.join(cache.PYINSTALLER_WORK_CACHE_DIR, 'other')
+
+    with cache.pyinstaller_work_dir('key') as again:
+        assert again == first
+
+
+def test_resources_extracted_once(mocker):
+
+    def _write(directory):
+        with open(os.path.join(directory, 'resource'), 'w') as stream:
+            stream.write('resource')
+
+    write = mocker.Mock(side_effect=_write)
+
+    first = cache.resources('name', write)
+    second = cache.resources('name', write)
+
+    assert first == second == os.path.join(cache.RESOURCES_CACHE_DIR, 'name')
+    assert os.path.exists(os.path.join(first, 'resource'))
+    assert os.listdir(cache.RESOURCES_CACHE_DIR) == ['name']
+    assert write.call_count == 1
+
+
+def test_resources_extracted_concurrently():
+
+    target = os.path.join(cache.RESOURCES_CACHE_DIR, 'name')
+
+    def _write(directory):
+        with open(os.path.join(directory, 'resource'), 'w') as stream:
+            stream.write('ours')
+        # someone else finishes extracting first.
+        os.makedirs(target)
+        with open(os.path.join(target, 'resource'), 'w') as stream:
+            stream.write('theirs')
+
+    assert cache.resources('name', _write) == target
+
+    with open(os.path.join(target, 'resource')) as stream:
+        assert stream.read() == 'theirs'
+
+    assert os.listdir(cache.RESOURCES_CACHE_DIR) == ['name']
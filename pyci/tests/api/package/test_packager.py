@@ -17,9 +17,12 @@
 
 import os
 import platform
+import stat
 import pytest
 
 from pyci.api import exceptions
+from pyci.api.package import cache
+from pyci.api.package import packager as packager_module
 from pyci.api.package.packager import Packager
 from pyci.api import utils
 from pyci.tests import conftest
@@ -119,6 +122,213 @@ def test_wheel_options(pack, repo_version):
     assert expected == actual
 
 
+def test_wheel_reuses_virtualenv(pack, mocker):
+
+    populate = mocker.spy(Packager, '_populate_virtualenv')
+
+    os.remove(pack.api.wheel())
+
+    assert populate.call_count == 1
+
+    pack.api.wheel()
+
+    assert populate.call_count == 1
+
+
+@pytest.mark.linux
+def test_wheel_private_cache(pack, cache_dir):
+
+    pack.api.wheel()
+
+    for directory in ['venvs', 'resources']:
+        assert stat.S_IMODE(os.stat(os.path.join(cache_dir, directory)).st_mode) == 0o700
+
+
+def test_wheel_requirements_order(repo_path, mocker):
+
+    populate = mocker.spy(Packager, '_populate_virtualenv')
+
+    def _wheel(requirements):
+        with open(os.path.join(repo_path, 'requirements.txt'), 'w') as stream:
+            stream.write(requirements)
+        os.remove(Packager.create(path=repo_path).wheel())
+
+    _wheel('# comment\n\nsix==1.11.0  # inline comment\nclick==7.0\n')
+    _wheel('click==7.0\nsix==1.11.0\n')
+
+    assert populate.call_count == 1
+
+
+@pytest.mark.parametrize('requirements', [
+    'six\n',
+    'six>=1.11.0\n',
+    '-r other.txt\n'
+])
+def test_wheel_requirements_not_pinned(pack, repo_path, mocker, cache_dir, requirements):
+
+    populate = mocker.spy(Packager, '_populate_virtualenv')
+
+    with open(os.path.join(repo_path, 'other.txt'), 'w') as stream:
+        stream.write('six==1.11.0\n')
+
+    with open(os.path.join(repo_path, 'requirements.txt'), 'w') as stream:
+        stream.write(requirements)
+
+    os.remove(pack.api.wheel())
+    pack.api.wheel()
+
+    assert populate.call_count == 2
+    assert not os.path.exists(os.path.join(cache_dir, 'venvs'))
+
+
+def test_wheel_no_cache(pack, mocker):
+
+    mocker.patch.dict(os.environ, {cache.NO_CACHE_ENV_VARIABLE: '1'})
+    populate = mocker.spy(Packager, '_populate_virtualenv')
+    write = mocker.spy(Packager, '_write_virtualenv_dist')
+
+    os.remove(pack.api.wheel())
+    pack.api.wheel()
+
+    assert populate.call_count == 2
+
+    # the extracted resources are still reused.
+    assert write.call_count == 1
+
+
+def test_setup_py_shared_between_packagers(temp_dir, mocker):
+
+    with open(os.path.join(temp_dir, 'setup.py'), 'w') as stream:
+        stream.write("from setuptools import setup\nsetup(name='name')\n")
+
+    parse = mocker.spy(Packager, '_parse_setup_py')
+
+    # pylint: disable=protected-access
+    first = Packager.create(path=temp_dir)._setup_py
+    second = Packager.create(path=temp_dir)._setup_py
+
+    assert first == second == {'name': 'name'}
+    assert parse.call_count == 1
+
+    with open(os.path.join(temp_dir, 'setup.py'), 'a') as stream:
+        stream.write('\n')
+
+    _ = Packager.create(path=temp_dir)._setup_py
+
+    assert parse.call_count == 2
+
+
+def test_setup_py_not_shared_between_packagers(temp_dir):
+
+    with open(os.path.join(temp_dir, 'setup.py'), 'w') as stream:
+        stream.write("from setuptools import setup\nsetup(name='name', install_requires=['six'])\n")
+
+    # pylint: disable=protected-access
+    first = Packager.create(path=temp_dir)._setup_py
+    first['install_requires'].append('click')
+
+    second = Packager.create(path=temp_dir)._setup_py
+
+    assert second == {'name': 'name', 'install_requires': ['six']}
+
+
+def test_setup_py_executed_every_time(repo_path, mocker):
+
+    execute = mocker.spy(Packager, '_exec_setup_py')
+
+    # pylint: disable=protected-access
+    first = Packager.create(path=repo_path)._setup_py
+    second = Packager.create(path=repo_path)._setup_py
+
+    assert first == second
+    assert execute.call_count == 2
+
+
+def test_setup_py_encoding_declaration(temp_dir):
+
+    with open(os.path.join(temp_dir, 'setup.py'), 'wb') as stream:
+        stream.write(u"# -*- coding: latin-1 -*-\n"
+                     u"from setuptools import setup\n"
+                     u"setup(name='name', author='Jos\xe9')\n".encode('latin-1'))
+
+    # pylint: disable=protected-access
+    assert Packager.create(path=temp_dir)._name == 'name'
+
+
+@pytest.mark.parametrize('setup_py', [
+    b"setup(name='name', x={[1]})",
+    b"setup(name='name', x=len('a'))",
+    b"setup(name='name', x=" + b'(' * 10000 + b')' * 10000 + b')',
+    b'setup(name=',
+])
+def test_parse_setup_py_not_literal(setup_py):
+
+    # pylint: disable=protected-access
+    assert Packager._parse_setup_py(setup_py) is None
+
+
+@pytest.mark.parametrize('name', ["'name'", "'na' + 'me'"])
+def test_setup_py_tuples(temp_dir, name):
+
+    # parsed statically, and executed.
+    with open(os.path.join(temp_dir, 'setup.py'), 'w') as stream:
+        stream.write("from setuptools import setup\n"
+                     "setup(name={}, install_requires=('six==1.11.0',), keywords={{'a'}})\n"
+                     .format(name))
+
+    # pylint: disable=protected-access
+    setup_py = Packager.create(path=temp_dir)._setup_py
+
+    assert setup_py == {'name': 'name', 'install_requires': ['six==1.11.0'], 'keywords': ['a']}
+
+
+def test_setup_py_unsupported_value(temp_dir):
+
+    with open(os.path.join(temp_dir, 'setup.py'), 'w') as stream:
+        stream.write("from setuptools import setup\n"
+                     "setup(name='name', version=object, cmdclass={'x': object})\n")
+
+    packager = Packager.create(path=temp_dir)
+
+    # pylint: disable=protected-access
+    # arguments we don't use don't matter.
+    assert packager._name == 'name'
+
+    with pytest.raises(exceptions.FailedReadingSetupPyException):
+        _ = packager._version
+
+
+def test_binary_reuses_work_dir(repo_path, mocker):
+
+    work_dir = mocker.spy(cache, 'pyinstaller_work_dir')
+
+    def _binary(requirements):
+        with open(os.path.join(repo_path, 'requirements.txt'), 'w') as stream:
+            stream.write(requirements)
+        os.remove(Packager.create(path=repo_path).binary())
+        return work_dir.call_args[0][0]
+
+    first = _binary('six==1.11.0\n')
+    bumped = _binary('six==1.12.0\n')
+    again = _binary('six==1.11.0\n')
+
+    # pyinstaller doesn't notice changes in the installed dependencies.
+    assert first != bumped
+    assert first == again
+
+
+def test_virtualenv_dist_name(mocker):
+
+    def _dist_name(virtualenv_py):
+        mocker.patch('pyci.api.package.packager._virtualenv_dist_name', None)
+        mocker.patch('pyci.api.package.packager.get_binary_resource', return_value=virtualenv_py)
+        # pylint: disable=protected-access
+        return packager_module._get_virtualenv_dist_name()
+
+    assert _dist_name(b'first') == _dist_name(b'first')
+    assert _dist_name(b'first') != _dist_name(b'second')
+
+
 def test_wheel_file_exists(pack, repo_version):
 
     py_version = 'py3' if utils.is_python_3() else 'py2'
@@ -232,6 +442,95 @@ if __name__ == '__main__':
     assert runner.run(actual).std_out == 'It works!'
 
 
+def test_build_all(pack, request, runner, repo_path, repo_version):
+
+    custom_main = os.path.join('pyci', 'shell', 'custom_main.py')
+    with open(os.path.join(repo_path, custom_main), 'w') as stream:
+        stream.write('''
+import six
+
+if __name__ == '__main__':
+    six.print_('It works!')
+''')
+
+    binary_path, wheel_path = pack.api.build_all([
+        {'kind': 'binary', 'base_name': request.node.name, 'entrypoint': custom_main},
+        {'kind': 'wheel', 'universal': True}
+    ])
+
+    assert runner.run(binary_path).std_out == 'It works!'
+    assert os.path.join(os.getcwd(), 'py_ci-{0}-py2.py3-none-any.whl'
+                        .format(repo_version)) == wheel_path
+
+
+def test_build_all_duplicate_kind(pack):
+
+    with pytest.raises(exceptions.InvalidArgumentsException):
+        pack.api.build_all([{'kind': 'wheel'}, {'kind': 'wheel', 'universal': True}])
+
+
+def test_build_all_unknown_kind(pack):
+
+    with pytest.raises(exceptions.InvalidArgumentsException):
+        pack.api.build_all([{'kind': 'rpm'}])
+
+
+def test_build_all_failure(pack):
+
+    with pytest.raises(exceptions.EntrypointNotFoundException):
+        pack.api.build_all([
+            {'kind': 'binary', 'entrypoint': 'doesnt-exist'},
+            {'kind': 'nsis', 'binary_path': 'doesnt-exist'}
+        ])
+
+
+def test_build_many(repo_path, temp_dir, mocker):
+
+    def _wheel(self, universal=False):
+        # pylint: disable=protected-access
+        return '{}-{}'.format(self._target_dir, universal)
+
+    mocker.patch.object(Packager, 'wheel', _wheel)
+
+    other_path = os.path.join(temp_dir, 'other')
+    os.mkdir(other_path)
+
+    first = Packager.create(path=repo_path)
+    second = Packager.create(path=other_path, target_dir=other_path)
+
+    assert Packager.build_many([
+        (first, {'kind': 'wheel'}),
+        (second, {'kind': 'wheel', 'universal': True})
+    ], max_workers=2) == ['{}-False'.format(os.getcwd()), '{}-True'.format(other_path)]
+
+
+def test_build_many_duplicate_kind(repo_path):
+
+    first = Packager.create(path=repo_path)
+    second = Packager.create(path=repo_path)
+
+    with pytest.raises(exceptions.InvalidArgumentsException):
+        Packager.build_many([(first, {'kind': 'wheel'}), (second, {'kind': 'wheel'})])
+
+
+def test_build_many_unknown_kind(pack):
+
+    with pytest.raises(exceptions.InvalidArgumentsException):
+        Packager.build_many([(pack.api, {'kind': 'rpm'})])
+
+
+def test_build_many_failure(repo_path, temp_dir):
+
+    other_path = os.path.join(temp_dir, 'other')
+    os.mkdir(other_path)
+
+    with pytest.raises(exceptions.EntrypointNotFoundException):
+        Packager.build_many([
+            (Packager.create(path=repo_path), {'kind': 'binary', 'entrypoint': 'doesnt-exist'}),
+            (Packager.create(path=other_path), {'kind': 'wheel'})
+        ])
+
+
 def test_binary_only_requirements_txt(runner):
 
     repo_path = test_resources.get_resource_path(os.path.join('repos', 'only-requirements'))
@@ -15,9 +15,12 @@
 #
 #############################################################################
 
+import io
 import os
 import tempfile
 import sys
+import tarfile
+import zipfile
 
 import pytest
 
@@ -76,6 +79,122 @@ def test_validate_file_does_not_exist():
     utils.validate_file_does_not_exist(path='doesnt-exist')
 
 
+def test_fast_copy(temp_dir):
+
+    src = os.path.join(temp_dir, 'src')
+    with open(src, 'w') as stream:
+        stream.write('content')
+    os.chmod(src, 0o755)
+
+    dst = os.path.join(temp_dir, 'dst')
+    utils.fast_copy(src, dst)
+
+    os.remove(src)
+
+    with open(dst) as stream:
+        assert stream.read() == 'content'
+    assert os.access(dst, os.X_OK)
+
+
+def test_fast_copy_link_fails(mocker, temp_dir):
+
+    src = os.path.join(temp_dir, 'src')
+    with open(src, 'w') as stream:
+        stream.write('content')
+    os.chmod(src, 0o755)
+
+    mocker.patch('os.link', side_effect=OSError('Invalid cross-device link'))
+
+    dst = os.path.join(temp_dir, 'dst')
+    utils.fast_copy(src, dst)
+
+    with open(dst) as stream:
+        assert stream.read() == 'content'
+    assert os.access(dst, os.X_OK)
+
+
+def test_unzip_file_object():
+
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, 'w') as zip_file:
+        zip_file.writestr('directory/file', 'content')
+
+    target_dir = utils.unzip(archive, target_dir=tempfile.mkdtemp())
+
+    with open(os.path.join(target_dir, 'directory', 'file')) as stream:
+        assert stream.read() == 'content'
+
+
+def _tar_gz(*members):
+
+    archive = io.BytesIO()
+    with tarfile.open(fileobj=archive, mode='w:gz') as tar:
+        for info, content in members:
+            info.size = len(content or b'')
+            tar.addfile(info, io.BytesIO(content) if content is not None else None)
+    archive.seek(0)
+    return archive
+
+
+def _special(name, member_type):
+    info = tarfile.TarInfo(name)
+    info.type = member_type
+    return info, None
+
+
+def _symlink(name, target):
+    info = tarfile.TarInfo(name)
+    info.type = tarfile.SYMTYPE
+    info.linkname = target
+    return info, None
+
+
+def test_download_repo(mocker, temp_dir):
+
+    archive = _tar_gz((tarfile.TarInfo('pyci-sha/setup.py'), b'setup()'),
+                      _symlink('pyci-sha/link.py', 'setup.py'))
+
+    response = mocker.MagicMock(status_code=200, raw=archive)
+    response.__enter__.return_value = response
+    get = mocker.patch('requests.get', return_value=response)
+    mocker.patch('tempfile.mkdtemp', return_value=temp_dir)
+
+    repo_dir = utils.download_repo('iliapolo/pyci', 'sha')
+
+    assert get.call_args[0][0] == 'https://github.com/iliapolo/pyci/archive/sha.tar.gz'
+    assert get.call_args[1]['timeout'] == (10, 60)
+    assert repo_dir == os.path.join(temp_dir, 'pyci-sha')
+    with open(os.path.join(repo_dir, 'setup.py')) as stream:
+        assert stream.read() == 'setup()'
+    assert response.__exit__.call_count == 1
+
+
+@pytest.mark.parametrize('member', [
+    (tarfile.TarInfo('../setup.py'), b'setup()'),
+    (tarfile.TarInfo('/tmp/setup.py'), b'setup()'),
+    _symlink('pyci-sha/link', '../../etc'),
+    _symlink('pyci-sha/link', '/etc'),
+    _special('pyci-sha/fifo', tarfile.FIFOTYPE),
+    _special('pyci-sha/device', tarfile.CHRTYPE),
+])
+def test_download_repo_unsafe_member(mocker, temp_dir, member):
+
+    archive = _tar_gz((tarfile.TarInfo('pyci-sha/setup.py'), b'setup()'), member)
+
+    response = mocker.MagicMock(status_code=200, raw=archive)
+    response.__enter__.return_value = response
+    mocker.patch('requests.get', return_value=response)
+    target_dir = os.path.join(temp_dir, 'target')
+    mocker.patch('tempfile.mkdtemp', return_value=target_dir)
+    os.mkdir(target_dir)
+
+    with pytest.raises(exceptions.UnsafeArchiveMemberException):
+        utils.download_repo('iliapolo/pyci', 'sha')
+
+    assert os.listdir(temp_dir) == []
+    assert response.__exit__.call_count == 1
+
+
 def test_extract_version_from_setup_py_double_quotes():
 
     expected = '0.1.0'
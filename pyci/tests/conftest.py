@@ -94,10 +94,32 @@ def _non_interactive():
     os.environ['PYCI_INTERACTIVE'] = 'False'
 
 
+@pytest.fixture(name='cache_dir', autouse=True)
+def _cache_dir(mocker):
+
+    # don't leave virtualenvs and extracted resources in the user's cache directory.
+    cache_dir = tempfile.mkdtemp()
+
+    try:
+        mocker.patch('pyci.api.package.cache.CACHE_DIR', cache_dir)
+        mocker.patch('pyci.api.package.cache.VIRTUALENVS_CACHE_DIR',
+                     os.path.join(cache_dir, 'venvs'))
+        mocker.patch('pyci.api.package.cache.RESOURCES_CACHE_DIR',
+                     os.path.join(cache_dir, 'resources'))
+        mocker.patch('pyci.api.package.cache.PYINSTALLER_WORK_CACHE_DIR',
+                     os.path.join(cache_dir, 'pyinstaller'))
+        yield cache_dir
+    finally:
+        utils.rmf(cache_dir)
+
+
 @pytest.fixture(name='_log', autouse=True)
 def _mock_log(mocker, log):
 
-    def _log(level, message, **kwargs):
+    def _log(level, message, *args, **kwargs):
+
+        if args:
+            message = message % args
 
         if os.environ.get(CLICK_ISOLATION):
             # This means we are running inside an isolated click